@@ -0,0 +1,111 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernel then runs as plain Python
+    def njit(**kwargs):
+        return lambda f: f
+
+
+# Slotted holders for the per-candle indicator state: the strategy itself inherits a __dict__
+# from ScriptStrategyBase, so __slots__ only pays off on these small, hot objects
+class _RSIState:
+    __slots__ = ("avg_gain", "avg_loss", "prev_close", "last_ts")
+
+    def __init__(self):
+        self.avg_gain = None
+        self.avg_loss = None
+        self.prev_close = None
+        self.last_ts = None
+
+
+class _NATRState:
+    __slots__ = ("atr", "natr", "prev_close", "last_ts")
+
+    def __init__(self):
+        self.atr = None
+        self.natr = None
+        self.prev_close = None
+        self.last_ts = None
+
+
+# Final NATR (scalar=1) state over whole float64 arrays with Wilder's recurrence
+# avg = (prev * (n - 1) + cur) / n, each average seeded with its first observation.
+# Returns (atr, natr, avg_gain, avg_loss); the RSI averages are NaN for fewer than two bars.
+@njit(cache=True)
+def _natr_rsi(high, low, close, n_natr, n_rsi):
+    size = close.shape[0]
+    if size == 0:
+        return np.nan, np.nan, np.nan, np.nan
+
+    atr = high[0] - low[0]
+    avg_gain = np.nan
+    avg_loss = np.nan
+
+    for i in range(1, size):
+        prev_close = close[i - 1]
+        true_range = max(high[i] - low[i], abs(high[i] - prev_close), abs(low[i] - prev_close))
+        atr = (atr * (n_natr - 1) + true_range) / n_natr
+
+        change = close[i] - prev_close
+        gain = max(change, 0.0)
+        loss = max(-change, 0.0)
+        if i == 1:
+            avg_gain = gain
+            avg_loss = loss
+        else:
+            avg_gain = (avg_gain * (n_rsi - 1) + gain) / n_rsi
+            avg_loss = (avg_loss * (n_rsi - 1) + loss) / n_rsi
+
+    return atr, atr / close[size - 1], avg_gain, avg_loss
+
+
+def _seed_states(high, low, close, n_natr, n_rsi):
+    atr, natr, avg_gain, avg_loss = _natr_rsi(high, low, close, n_natr, n_rsi)
+    natr_state = _NATRState()
+    rsi_state = _RSIState()
+    natr_state.atr = float(atr)
+    natr_state.natr = float(natr)
+    natr_state.prev_close = rsi_state.prev_close = float(close[-1])
+    if len(close) > 1:
+        rsi_state.avg_gain = float(avg_gain)
+        rsi_state.avg_loss = float(avg_loss)
+    return natr_state, rsi_state
+
+
+# Single-candle counterparts of the kernel, used once the state is seeded
+def _natr_step(state: _NATRState, high: float, low: float, close: float, n: int):
+    prev_close = state.prev_close
+    if prev_close is None:
+        true_range = high - low
+    else:
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+    state.atr = true_range if state.atr is None else (state.atr * (n - 1) + true_range) / n
+    state.natr = state.atr / close
+    state.prev_close = close
+
+
+def _rsi_step(state: _RSIState, close: float, n: int):
+    prev_close = state.prev_close
+    state.prev_close = close
+    if prev_close is None:
+        return
+
+    change = close - prev_close
+    gain = max(change, 0.0)
+    loss = max(-change, 0.0)
+
+    if state.avg_gain is None:
+        state.avg_gain, state.avg_loss = gain, loss
+    else:
+        state.avg_gain = (state.avg_gain * (n - 1) + gain) / n
+        state.avg_loss = (state.avg_loss * (n - 1) + loss) / n
+
+
+def _rsi_value(state: _RSIState) -> float:
+    if state.avg_gain is None:
+        return 50.0
+    if state.avg_loss == 0:
+        return 100.0
+    return 100 - 100 / (1 + state.avg_gain / state.avg_loss)
@@ -1,14 +1,35 @@
+import asyncio
 import logging
+import os
+import pickle
+import time
+from collections import deque
 from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, List, Sequence, Tuple
 
-import pandas_ta as ta
+import aiohttp
+import numpy as np
 from hummingbot.core.data_type.common import OrderType, PriceType, TradeType
 from hummingbot.core.data_type.order_candidate import OrderCandidate
 from hummingbot.core.event.events import OrderFilledEvent
+from hummingbot.core.utils.async_utils import safe_ensure_future
 from hummingbot.strategy.script_strategy_base import ScriptStrategyBase
 from hummingbot.data_feed.candles_feed.candles_factory import CandlesFactory, CandlesConfig
 from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot import data_path
+
+try:
+    from ._indicators_numba import _NATRState, _RSIState, _natr_step, _rsi_step, _rsi_value, _seed_states
+except ImportError:
+    from _indicators_numba import _NATRState, _RSIState, _natr_step, _rsi_step, _rsi_value, _seed_states
+
+BOOK_TICKER_WS_URL = "wss://stream.binance.com:9443/ws/{symbol}@bookTicker"
+
+
+def _D(x) -> Decimal:
+    # float() normalises numpy scalars, whose repr is not a plain number under numpy 2
+    return Decimal(repr(float(x))) if isinstance(x, float) else Decimal(x)
+
 
 class PMMVolatilityTrendRisk(ScriptStrategyBase):
     trading_pair = "SOL-USDT"
@@ -38,15 +59,30 @@ class PMMVolatilityTrendRisk(ScriptStrategyBase):
     volume_spike_multiplier = Decimal("2")  # spike if current volume > 2x average
     volume_spike_active = False
 
+    # Live orders within this fraction of the spread (or one tick) of the new quote are kept
+    reprice_spread_fraction = 0.2
+
+    # Best bid/ask from the Binance bookTicker stream, older quotes fall back to the connector book
+    book_ticker_max_age = 1.0
+
     # Define which markets to connect to
     markets = {exchange: {trading_pair}}
 
     def __init__(self, connectors: Dict[str, ConnectorBase]):
         super().__init__(connectors)
+        self._base_asset, self._quote_asset = self.trading_pair.split("-")
+        self._connector = self.connectors[self.exchange]
         self.create_timestamp = 0
-        self.bid_spread = Decimal("0.001")
-        self.ask_spread = Decimal("0.001")
-        self.rsi = Decimal("50")
+        self.bid_spread = 0.001
+        self.ask_spread = 0.001
+        self.rsi = 50.0
+        self._base_refresh_time_f = float(self.base_refresh_time)
+        self._volatility_scalar_f = float(self.volatility_scalar)
+
+        # Set once update_indicators has run against the live candle feed
+        self._indicators_ready = False
+        self._reset_indicator_state()
+        self._load_indicator_state()
 
         # Manual balance fallback
         self.manual_base_balance = Decimal("0")
@@ -65,100 +101,268 @@ class PMMVolatilityTrendRisk(ScriptStrategyBase):
             self.logger().error(f"Failed to initialize candle feed: {e}")
             self.candles = None
 
+        # Closed candles are pushed into the indicator state by a background task, not pulled per tick
+        self._candles_task = safe_ensure_future(self._ingest_candles()) if self.candles else None
+
+        self._best_bid = 0.0
+        self._best_ask = 0.0
+        self._book_ts = 0.0
+        self._book_ticker_task = safe_ensure_future(self._listen_book_ticker())
+
+        # Last proposal and the (buy price, sell price, amount) it was built for
+        self._proposal_key = None
+        self._proposal = ()
+
+        # Rendered closed-candles table, reused until the next candle closes
+        self._status_cache = {"ts": None, "text": None}
+
+    def _reset_indicator_state(self):
+        # Wilder-smoothed indicator state, advanced one closed candle at a time
+        self._rsi_state = _RSIState()
+        self._natr_state = _NATRState()
+
+        # Timestamp of the forming candle seen by the last indicator update
+        self._last_bar_ts = None
+
+        # Running sum over the last candles_length volumes
+        self._vol_sum = 0.0
+        self._vol_window = deque(maxlen=self.candles_length)
+
+    def _indicator_state_path(self) -> str:
+        return os.path.join(
+            data_path(), f"{type(self).__name__}_{self.candle_exchange}_{self.trading_pair}_{self.candles_interval}.pkl")
+
+    def _save_indicator_state(self):
+        if self._natr_state.natr is None:
+            return
+        state = (self._rsi_state, self._natr_state, self._vol_sum, list(self._vol_window))
+        try:
+            with open(self._indicator_state_path(), "wb") as f:
+                pickle.dump({"params": (self.candles_length, self.rsi_period, self.max_records), "state": state}, f)
+        except Exception as e:
+            self.logger().warning(f"Failed to save indicator state: {e}")
+
+    def _load_indicator_state(self):
+        path = self._indicator_state_path()
+        if not os.path.exists(path):
+            return
+        # Only the raw state is restored, spreads and RSI are derived once the live feed confirms it
+        try:
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+            if saved["params"] != (self.candles_length, self.rsi_period, self.max_records):
+                return
+            self._rsi_state, self._natr_state, self._vol_sum, vol_window = saved["state"]
+            self._vol_window = deque(vol_window, maxlen=self.candles_length)
+        except Exception as e:
+            self.logger().warning(f"Failed to load indicator state: {e}")
+            self._reset_indicator_state()
+
     def on_stop(self):
+        self._save_indicator_state()
         if self.candles:
             self.candles.stop()
+        if self._candles_task:
+            self._candles_task.cancel()
+        self._book_ticker_task.cancel()
+
+    async def _ingest_candles(self):
+        interval = self.candles.interval_in_seconds
+        while True:
+            try:
+                last_bar_ts = self._last_bar_ts
+                if self.candles.ready:
+                    self.update_indicators()
+                if self._last_bar_ts != last_bar_ts:
+                    # Nothing new can close before the next candle opens
+                    await asyncio.sleep(interval - time.time() % interval + 1)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger().error(f"Failed to update indicators: {e}", exc_info=True)
+            await asyncio.sleep(1)
+
+    async def _listen_book_ticker(self):
+        url = BOOK_TICKER_WS_URL.format(symbol=self.trading_pair.replace("-", "").lower())
+        while True:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(url) as ws:
+                        async for msg in ws:
+                            if msg.type != aiohttp.WSMsgType.TEXT:
+                                continue
+                            data = msg.json()
+                            self._best_bid = float(data["b"])
+                            self._best_ask = float(data["a"])
+                            self._book_ts = time.time()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger().warning(f"bookTicker stream error: {e}. Reconnecting in 5s.")
+                await asyncio.sleep(5)
+
+    def _best_bid_ask(self) -> Tuple[float, float]:
+        if time.time() - self._book_ts <= self.book_ticker_max_age:
+            return self._best_bid, self._best_ask
+        get_price = self._connector.get_price
+        return float(get_price(self.trading_pair, False)), float(get_price(self.trading_pair, True))
 
     def on_tick(self):
-        if not self.ready_to_trade or not self.candles or self.candles.candles_df.empty:
+        if not self.ready_to_trade or not self.candles or not self._indicators_ready:
             return
         if self.create_timestamp <= self.current_timestamp:
-            self.cancel_all_orders()
-            self.update_indicators()
             proposal = self.create_proposal()
+            proposal = self.cancel_stale_orders(proposal)
             adjusted = self.adjust_proposal_to_budget(proposal)
             self.place_orders(adjusted)
             self.create_timestamp = self.current_timestamp + self.order_refresh_time
 
     def update_indicators(self):
-        df = self.candles.candles_df.copy()
-        if df.empty:
+        df = self.candles.candles_df
+        # The last row is the still-forming candle, only closed candles feed the indicators
+        if len(df) < 2:
             return
+        # A new forming candle means the previous one just closed, otherwise nothing changed
+        last_ts = df["timestamp"].iloc[-1]
+        if last_ts == self._last_bar_ts:
+            return
+        self._last_bar_ts = last_ts
+        closed = df.iloc[:-1]
+
+        timestamps = closed["timestamp"].to_numpy()
+        processed_ts = self._rsi_state.last_ts
+        if processed_ts is not None and timestamps[0] > processed_ts:
+            # Restored state predates the available history, rebuild it from scratch
+            self._reset_indicator_state()
+            self._last_bar_ts = last_ts
+            processed_ts = None
+        start = 0 if processed_ts is None else np.searchsorted(timestamps, processed_ts, side="right")
+        if start < len(timestamps):
+            new_rows = closed.iloc[start:]
+            if processed_ts is None:
+                self._bootstrap_indicators(new_rows)
+            else:
+                for high, low, close, volume in zip(new_rows["high"].to_numpy(), new_rows["low"].to_numpy(),
+                                                    new_rows["close"].to_numpy(), new_rows["volume"].to_numpy()):
+                    self._push_volume(volume)
+                    _natr_step(self._natr_state, high, low, close, self.candles_length)
+                    _rsi_step(self._rsi_state, close, self.rsi_period)
+            self._rsi_state.last_ts = self._natr_state.last_ts = new_rows["timestamp"].iloc[-1]
+
+        if self._natr_state.natr is None:
+            return
+        self._apply_indicators()
+        self._indicators_ready = True
+
+    def _apply_indicators(self):
+        natr = self._natr_state.natr
+        self.bid_spread = natr * float(self.bid_spread_scalar)
+        self.ask_spread = natr * float(self.ask_spread_scalar)
+        self.rsi = _rsi_value(self._rsi_state)
 
-        df.ta.natr(length=self.candles_length, scalar=1, append=True)
-        df.ta.rsi(length=self.rsi_period, append=True)
+        self.order_refresh_time = self._base_refresh_time_f / (1.0 + self._volatility_scalar_f * natr)
 
-        latest = df.iloc[-1]
-        self.bid_spread = Decimal(str(latest[f"NATR_{self.candles_length}"])) * self.bid_spread_scalar
-        self.ask_spread = Decimal(str(latest[f"NATR_{self.candles_length}"])) * self.ask_spread_scalar
-        self.rsi = Decimal(str(latest[f"RSI_{self.rsi_period}"]))
+        # Spike check on the last closed candle against the closed-candle window, so tightening
+        # applies for the candle after the spike rather than while the spike candle is forming
+        avg_volume = self._vol_sum / len(self._vol_window)
+        self.volume_spike_active = self._vol_window[-1] > float(self.volume_spike_multiplier) * avg_volume
 
-        natr = Decimal(str(latest[f"NATR_{self.candles_length}"]))
-        self.order_refresh_time = float(self.base_refresh_time / (1 + self.volatility_scalar * natr))
+    def _bootstrap_indicators(self, rows):
+        high = rows["high"].to_numpy(dtype=np.float64)
+        low = rows["low"].to_numpy(dtype=np.float64)
+        close = rows["close"].to_numpy(dtype=np.float64)
+        volume = rows["volume"].to_numpy(dtype=np.float64)
 
-        avg_volume = Decimal(str(df['volume'].iloc[-self.candles_length:].mean()))
-        self.volume_spike_active = Decimal(str(latest['volume'])) > self.volume_spike_multiplier * avg_volume
+        self._natr_state, self._rsi_state = _seed_states(high, low, close, self.candles_length, self.rsi_period)
 
-    def create_proposal(self) -> List[OrderCandidate]:
-        ref_price = Decimal(str(self.connectors[self.exchange].get_price_by_type(self.trading_pair, self.price_source)))
-        base_asset, quote_asset = self.trading_pair.split("-")
+        window = volume[-self.candles_length:]
+        self._vol_window.extend(window.tolist())
+        self._vol_sum = float(window.sum())
+
+    def _push_volume(self, volume: float):
+        incoming = float(volume)
+        leaving = self._vol_window[0] if len(self._vol_window) == self.candles_length else 0.0
+        self._vol_sum += incoming - leaving
+        self._vol_window.append(incoming)
+
+    def create_proposal(self) -> Tuple[OrderCandidate, OrderCandidate]:
+        connector = self._connector
+        ref_price = float(connector.get_price_by_type(self.trading_pair, self.price_source))
 
         if self.use_manual_balances:
-            base = self.manual_base_balance
-            quote = self.manual_quote_balance
+            base = float(self.manual_base_balance)
+            quote = float(self.manual_quote_balance)
         else:
-            base = Decimal(str(self.connectors[self.exchange].get_balance(base_asset)))
-            quote = Decimal(str(self.connectors[self.exchange].get_balance(quote_asset)))
+            base = float(connector.get_balance(self._base_asset))
+            quote = float(connector.get_balance(self._quote_asset))
 
         total_value = base * ref_price + quote
-        base_ratio = (base * ref_price / total_value) if total_value > 0 else Decimal("0.5")
-        inventory_skew = (Decimal("0.5") - base_ratio) * self.inventory_risk_scalar * ref_price
+        base_ratio = (base * ref_price / total_value) if total_value > 0 else 0.5
+        inventory_skew = (0.5 - base_ratio) * float(self.inventory_risk_scalar) * ref_price
 
-        rsi_skew = Decimal("0")
+        rsi_skew = 0.0
         if self.rsi > 70:
-            rsi_skew = self.rsi_skew_scalar * ref_price
+            rsi_skew = float(self.rsi_skew_scalar) * ref_price
         elif self.rsi < 30:
-            rsi_skew = -self.rsi_skew_scalar * ref_price
+            rsi_skew = -float(self.rsi_skew_scalar) * ref_price
 
         mid_price = ref_price + inventory_skew + rsi_skew
 
         self.logger().info(
-            f"[Inventory] Base: {base:.4f}, Quote: {quote:.2f}, Base Ratio: {base_ratio:.4f}, "
-            f"Inventory Skew: {inventory_skew:.4f}, Mid Price: {mid_price:.2f}"
+            "[Inventory] Base: %.4f, Quote: %.2f, Base Ratio: %.4f, Inventory Skew: %.4f, Mid Price: %.2f",
+            base, quote, base_ratio, inventory_skew, mid_price
         )
 
-        best_bid = Decimal(str(self.connectors[self.exchange].get_price(self.trading_pair, False)))
-        best_ask = Decimal(str(self.connectors[self.exchange].get_price(self.trading_pair, True)))
+        best_bid, best_ask = self._best_bid_ask()
 
-        buy_price = min(mid_price * (Decimal("1") - self.bid_spread), best_bid)
-        sell_price = max(mid_price * (Decimal("1") + self.ask_spread), best_ask)
+        buy_price = min(mid_price * (1 - self.bid_spread), best_bid)
+        sell_price = max(mid_price * (1 + self.ask_spread), best_ask)
 
         if self.volume_spike_active:
-            buy_price *= Decimal("1.002")
-            sell_price *= Decimal("0.998")
+            buy_price *= 1.002
+            sell_price *= 0.998
             self.logger().info("Volume spike detected. Tightening spreads!")
 
-        return [
-            OrderCandidate(self.trading_pair, True, OrderType.LIMIT, TradeType.BUY, self.order_amount, buy_price),
-            OrderCandidate(self.trading_pair, True, OrderType.LIMIT, TradeType.SELL, self.order_amount, sell_price),
-        ]
+        # Prices only become Decimal here, at the exchange boundary
+        buy_price = connector.quantize_order_price(self.trading_pair, _D(buy_price))
+        sell_price = connector.quantize_order_price(self.trading_pair, _D(sell_price))
 
-    def adjust_proposal_to_budget(self, proposal: List[OrderCandidate]) -> List[OrderCandidate]:
-        return self.connectors[self.exchange].budget_checker.adjust_candidates(proposal, all_or_none=True)
+        # Reuse the previous candidates when the quantized quote is unchanged
+        key = (buy_price, sell_price, self.order_amount)
+        if key != self._proposal_key:
+            self._proposal_key = key
+            self._proposal = (
+                OrderCandidate(self.trading_pair, True, OrderType.LIMIT, TradeType.BUY, self.order_amount, buy_price),
+                OrderCandidate(self.trading_pair, True, OrderType.LIMIT, TradeType.SELL, self.order_amount, sell_price),
+            )
+        return self._proposal
+
+    def adjust_proposal_to_budget(self, proposal: Sequence[OrderCandidate]) -> List[OrderCandidate]:
+        return self._connector.budget_checker.adjust_candidates(proposal, all_or_none=True)
 
     def place_orders(self, orders: List[OrderCandidate]):
         for order in orders:
-            direction = "BUY" if order.order_side == TradeType.BUY else "SELL"
-            self.logger().info(f"Placing {direction} order: {order.amount} {order.trading_pair} at {order.price:.4f}")
+            self.logger().info("Placing %s order: %s %s at %.4f",
+                               order.order_side.name, order.amount, order.trading_pair, order.price)
             if order.order_side == TradeType.BUY:
                 self.buy(self.exchange, order.trading_pair, order.amount, order.order_type, order.price)
             else:
                 self.sell(self.exchange, order.trading_pair, order.amount, order.order_type, order.price)
 
-    def cancel_all_orders(self):
+    def cancel_stale_orders(self, proposal: Sequence[OrderCandidate]) -> List[OrderCandidate]:
+        kept_sides = set()
         for order in self.get_active_orders(self.exchange):
-            self.logger().info(f"Cancelling order: {order.client_order_id} at {order.price}")
+            candidate, spread = (proposal[0], self.bid_spread) if order.is_buy else (proposal[1], self.ask_spread)
+            new_price = float(candidate.price)
+            threshold = max(new_price * spread * self.reprice_spread_fraction,
+                            float(self._connector.get_order_price_quantum(self.trading_pair, candidate.price)))
+            if order.is_buy not in kept_sides and abs(float(order.price) - new_price) <= threshold:
+                kept_sides.add(order.is_buy)
+                continue
+            self.logger().info("Cancelling order: %s at %s", order.client_order_id, order.price)
             self.cancel(self.exchange, order.trading_pair, order.client_order_id)
+        return [c for c in proposal if (c.order_side == TradeType.BUY) not in kept_sides]
 
     def did_fill_order(self, event: OrderFilledEvent):
         msg = f"{event.trade_type.name} {round(event.amount, 2)} {event.trading_pair} {self.exchange} at {round(event.price, 2)}"
@@ -166,12 +370,14 @@ class PMMVolatilityTrendRisk(ScriptStrategyBase):
         self.notify_hb_app_with_timestamp(msg)
 
         if self.use_manual_balances:
+            amount = _D(event.amount)
+            notional = amount * _D(event.price)
             if event.trade_type == TradeType.BUY:
-                self.manual_base_balance += Decimal(str(event.amount))
-                self.manual_quote_balance -= Decimal(str(event.amount)) * Decimal(str(event.price))
+                self.manual_base_balance += amount
+                self.manual_quote_balance -= notional
             elif event.trade_type == TradeType.SELL:
-                self.manual_base_balance -= Decimal(str(event.amount))
-                self.manual_quote_balance += Decimal(str(event.amount)) * Decimal(str(event.price))
+                self.manual_base_balance -= amount
+                self.manual_quote_balance += notional
 
     def format_status(self) -> str:
         lines = []
@@ -186,27 +392,37 @@ class PMMVolatilityTrendRisk(ScriptStrategyBase):
         except ValueError:
             lines.append("\n  No active maker orders.")
 
-        ref_price = Decimal(str(self.connectors[self.exchange].get_price_by_type(self.trading_pair, self.price_source)))
-        best_bid = Decimal(str(self.connectors[self.exchange].get_price(self.trading_pair, False)))
-        best_ask = Decimal(str(self.connectors[self.exchange].get_price(self.trading_pair, True)))
+        ref_price = float(self._connector.get_price_by_type(self.trading_pair, self.price_source))
+        best_bid, best_ask = self._best_bid_ask()
 
-        bid_spread_bps = (ref_price - best_bid) / ref_price * Decimal("10000")
-        ask_spread_bps = (best_ask - ref_price) / ref_price * Decimal("10000")
+        bps_per_price = 10000 / ref_price
+        bid_spread_bps = (ref_price - best_bid) * bps_per_price
+        ask_spread_bps = (best_ask - ref_price) * bps_per_price
 
         lines.extend(["\n----------------------------------------------------------------------"])
         lines.extend([
             f"  Mid Price: {ref_price:.2f}",
             f"  RSI: {self.rsi:.2f}",
-            f"  Bid Spread: {self.bid_spread * Decimal('10000'):.2f} bps | Best Bid Spread: {bid_spread_bps:.2f} bps",
-            f"  Ask Spread: {self.ask_spread * Decimal('10000'):.2f} bps | Best Ask Spread: {ask_spread_bps:.2f} bps",
+            f"  Bid Spread: {self.bid_spread * 10000:.2f} bps | Best Bid Spread: {bid_spread_bps:.2f} bps",
+            f"  Ask Spread: {self.ask_spread * 10000:.2f} bps | Best Ask Spread: {ask_spread_bps:.2f} bps",
             f"  Adaptive Refresh Time: {self.order_refresh_time:.2f}s",
             f"  Volume Spike Active: {self.volume_spike_active}"
         ])
         lines.append("----------------------------------------------------------------------")
 
         if self.candles:
-            candles_df = self.candles.candles_df.tail(self.candles_length)
             lines.append(f"\n  Candles: {self.candles.name} | Interval: {self.candles.interval}")
-            lines.extend(["    " + line for line in candles_df[::-1].to_string(index=False).split("\n")])
+            lines.append(self._format_candles())
 
         return "\n".join(lines)
+
+    def _format_candles(self) -> str:
+        # candles_df is rebuilt on every access, so it is only read when a new candle has closed
+        if self._last_bar_ts is not None and self._last_bar_ts == self._status_cache["ts"]:
+            return self._status_cache["text"]
+        closed = self.candles.candles_df.iloc[:-1]
+        text = "\n".join("    " + line for line in
+                         closed.tail(self.candles_length).iloc[::-1].to_string(index=False).split("\n"))
+        self._status_cache["ts"] = self._last_bar_ts
+        self._status_cache["text"] = text
+        return text
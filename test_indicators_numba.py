@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from _indicators_numba import _natr_rsi, _natr_step, _rsi_step, _rsi_value, _seed_states
+
+N_NATR = 30
+N_RSI = 14
+
+
+def _candles(size=200, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=size))
+    high = close + rng.random(size)
+    low = close - rng.random(size)
+    return high, low, close
+
+
+def test_bootstrap_then_incremental_matches_single_kernel_pass():
+    high, low, close = _candles()
+
+    natr_state, rsi_state = _seed_states(high[:100], low[:100], close[:100], N_NATR, N_RSI)
+    for i in range(100, len(close)):
+        _natr_step(natr_state, high[i], low[i], close[i], N_NATR)
+        _rsi_step(rsi_state, close[i], N_RSI)
+
+    atr, natr, avg_gain, avg_loss = _natr_rsi(high, low, close, N_NATR, N_RSI)
+    assert natr_state.atr == pytest.approx(atr, rel=1e-12)
+    assert natr_state.natr == pytest.approx(natr, rel=1e-12)
+    assert rsi_state.avg_gain == pytest.approx(avg_gain, rel=1e-12)
+    assert rsi_state.avg_loss == pytest.approx(avg_loss, rel=1e-12)
+
+
+def test_kernel_matches_incremental_from_empty_state():
+    high, low, close = _candles(size=50, seed=1)
+
+    natr_state, rsi_state = _seed_states(high[:1], low[:1], close[:1], N_NATR, N_RSI)
+    assert rsi_state.avg_gain is None
+    assert _rsi_value(rsi_state) == 50.0
+    for i in range(1, len(close)):
+        _natr_step(natr_state, high[i], low[i], close[i], N_NATR)
+        _rsi_step(rsi_state, close[i], N_RSI)
+
+    atr, natr, avg_gain, avg_loss = _natr_rsi(high, low, close, N_NATR, N_RSI)
+    assert natr_state.natr == pytest.approx(natr, rel=1e-12)
+    assert _rsi_value(rsi_state) == pytest.approx(100 - 100 / (1 + avg_gain / avg_loss), rel=1e-12)
+
+
+def test_rsi_is_100_without_losses():
+    close = np.arange(1.0, 21.0)
+    _, rsi_state = _seed_states(close + 0.5, close - 0.5, close, N_NATR, N_RSI)
+    assert _rsi_value(rsi_state) == 100.0